@@ -1,16 +1,195 @@
 import os
 import sys
 import json
+import time
+import uuid
+import shutil
 import warnings
 import configparser
 
 
+# expanduser() may fall back to the password database, so resolve the
+# home directory only once
+_HOME = os.path.abspath(os.path.expanduser('~'))
+
+
 def _show_only_warning_message(msg, *args, **kwargs):
     # the default warning behavior shows a superfluous line of code
     # See: https://stackoverflow.com/a/2187390
     return str(msg) + '\n'
 
-warnings.formatwarning = _show_only_warning_message
+# install the hook once, even if the module is reloaded
+if getattr(warnings.formatwarning, '__module__', None) != __name__:
+    warnings.formatwarning = _show_only_warning_message
+
+
+# [General] options already parsed from disk, keyed by absolute path.
+# Each entry holds the _stat_key() of the file the options were read at.
+_PARSE_CACHE = {}
+# some filesystems only store modification times to the second or two
+_RACY_NS = 2_000_000_000
+
+
+def _stat_key(stat):
+    # a replaced file has a new inode; a rewritten one a new ctime
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_ctime_ns, stat.st_size)
+
+
+def _parse_general(f):
+    # A single pass over the lines following ConfigParser's defaults:
+    # '#' and ';' start comment lines, the first '=' or ':' delimits
+    # an option, option names are lowercased, deeper indented lines
+    # continue the previous value and [DEFAULT] options apply to every
+    # section.  Only the [General] options are returned.
+    source   = getattr(f, 'name', '<???>')
+    defaults = {}
+    general  = None
+    seen     = set()  # sections and (section, option) pairs
+    name     = None   # current section
+    section  = None   # options of the current section
+    option   = None   # option which a continuation line extends
+    indent   = 0
+    error    = None
+
+    for lineno, line in enumerate(f, start=1):
+        value = line.strip()
+
+        if not value or value[0] in '#;':
+            # blank lines may belong to a multiline value
+            if not value and option:
+                section[option].append('')
+            continue
+
+        current_indent = len(line) - len(line.lstrip())
+        if option and current_indent > indent:
+            section[option].append(value)
+            continue
+        indent = current_indent
+
+        end = value.rfind(']')
+        if value[0] == '[' and end > 1:
+            name = value[1:end]
+            if name == 'DEFAULT':
+                section = defaults
+            elif name in seen:
+                raise configparser.DuplicateSectionError(name, source, lineno)
+            else:
+                seen.add(name)
+                section = {}
+                if name == 'General':
+                    general = section
+            option = None
+        elif section is None:
+            raise configparser.MissingSectionHeaderError(source, lineno, line)
+        else:
+            i = value.find('=')
+            j = value.find(':', 0, i) if i >= 0 else value.find(':')
+            if j >= 0:
+                i = j
+            if i <= 0:
+                # reported once the whole file has been read
+                if error is None:
+                    error = configparser.ParsingError(source)
+                error.append(lineno, repr(line))
+                if i < 0:
+                    continue
+            option = value[:i].rstrip().lower()
+            if (name, option) in seen:
+                raise configparser.DuplicateOptionError(name, option, source, lineno)
+            seen.add((name, option))
+            section[option] = [value[i + 1:].lstrip()]
+
+    if error is not None:
+        raise error
+
+    if general is None:
+        return {}
+
+    options = {}
+    for key, lines in (*defaults.items(), *general.items()):
+        options[key] = '\n'.join(lines).rstrip()
+    return options
+
+
+def _load_general(filename):
+    filename = os.path.abspath(filename)
+
+    # NOTE: raises FileNotFoundError for a missing file
+    stat   = os.stat(filename)
+    cached = _PARSE_CACHE.get(filename)
+    if cached is not None and cached[0] == _stat_key(stat):
+        return cached[1]
+
+    with open(filename, 'r', encoding='utf-8') as f:
+        stat    = os.fstat(f.fileno())
+        options = _parse_general(f)
+
+    # A file modified within the timestamp resolution of now may change
+    # again without its stat changing ("racily clean" in git's terms),
+    # so only cache what has had time to settle.
+    if time.time_ns() - stat.st_mtime_ns > _RACY_NS:
+        _PARSE_CACHE[filename] = (_stat_key(stat), options)
+    else:
+        _PARSE_CACHE.pop(filename, None)
+    return options
+
+
+_JSON_CONSTANTS = {'true': True, 'false': False, 'null': None}
+
+
+def _decode(raw):
+    # json.loads() for the common cases, without the decoder
+    if raw in _JSON_CONSTANTS:
+        return _JSON_CONSTANTS[raw]
+
+    digits = raw[1:] if raw[:1] == '-' else raw
+    if digits.isascii() and digits.isdigit() and (digits[0] != '0' or digits == '0'):
+        return int(raw)
+
+    # strings without escapes or control characters
+    if len(raw) > 1 and raw[0] == '"' and raw[-1] == '"':
+        inner = raw[1:-1]
+        if inner.isprintable() and '"' not in inner and '\\' not in inner:
+            return inner
+
+    return json.loads(raw)
+
+
+def _encode(value):
+    # json.dumps() for the common cases, without the encoder
+    if value is True:
+        return 'true'
+    if value is False:
+        return 'false'
+    if value is None:
+        return 'null'
+
+    cls = type(value)
+    if cls is int:
+        return str(value)
+
+    # strings which json.dumps() wouldn't escape
+    if (cls is str and value.isascii() and value.isprintable()
+            and '"' not in value and '\\' not in value):
+        return f'"{value}"'
+
+    return json.dumps(value)
+
+
+def _write_general(f, options):
+    # same layout as ConfigParser.write(), handed over in one call
+    lines = [f"{key} = {value}\n" for key, value in options.items()]
+    f.write(''.join(['[General]\n', *lines, '\n']))
+
+
+def _class_defines(cls, name):
+    # where attribute lookup on instances of cls finds class
+    # attributes; unlike hasattr(cls, name), no AttributeError is
+    # raised on a miss
+    for base in cls.__mro__:
+        if name in base.__dict__:
+            return True
+    return False
 
 
 class OverwriteWarning(UserWarning):
@@ -55,6 +234,8 @@ class Setting:
 
     """
 
+    __slots__ = ('key', '_default', 'value', 'setter', 'getter')
+
     def __init__(self, key, default=None, setter=None, getter=None):
 
         self.key      = key
@@ -64,15 +245,42 @@ class Setting:
         self.getter   = getter
 
 
+class _SettingDescriptor:
+    """Route attribute access on a Configuration to a Setting value.
+
+    Avoids falling through to the comparatively slow __getattr__,
+    which remains for keys that can't be bound to the class.
+
+    """
+
+    __slots__ = ('key',)
+
+    def __init__(self, key):
+        self.key = key
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        try:
+            return instance.__dict__['_settings'][self.key].value
+        except KeyError:
+            # descriptor left behind by another instance; let
+            # __getattr__ report the missing setting
+            raise AttributeError(self.key) from None
+
+
 class SingletonMetaclass(type):
     "Force a single Configuration instance."
 
     _instances = {}
 
     def __call__(cls, *args, **kwargs):
-        if cls not in SingletonMetaclass._instances:
-            SingletonMetaclass._instances[cls] = super().__call__(*args, **kwargs)
-        return SingletonMetaclass._instances[cls]
+        instances = SingletonMetaclass._instances
+        instance  = instances.get(cls)
+        if instance is None:
+            instance = super().__call__(*args, **kwargs)
+            instances[cls] = instance
+        return instance
 
     def __reset(cls):
         """Delete the instance.
@@ -104,6 +312,8 @@ class Configuration(metaclass=SingletonMetaclass):
 
       Location on disk to read and write Settings.  Default name is
       '<calling_module>_config', located in the user's home directory.
+      For a dotted script name such as 'my.app.py', an existing
+      'my_config' from earlier versions is used in its place.
 
     Properties
     ----------
@@ -117,12 +327,20 @@ class Configuration(metaclass=SingletonMetaclass):
         super().__init__()
 
         if filename is None:
-            home_directory = os.path.expanduser('~')
-            calling_module = os.path.basename(sys.argv[0]).split('.')[0]
+            # _HOME is absolute, so the default needs no abspath()
+            home_directory = _HOME
+            script         = os.path.basename(sys.argv[0])
+            calling_module = os.path.splitext(script)[0]
             config_file    = calling_module + "_config"
             filename       = os.path.join(home_directory, config_file)
-
-        filename = os.path.abspath(filename)
+            # dotted script names used to be cut at the first '.'
+            legacy = os.path.join(home_directory, script.split('.')[0] + "_config")
+            if (legacy != filename
+                and not os.path.exists(filename)
+                and os.path.exists(legacy)):
+                filename = legacy
+        else:
+            filename = os.path.abspath(filename)
 
         # must define this way since we're overriding __setattr__
         self.__dict__['_settings'] = {}
@@ -140,7 +358,11 @@ class Configuration(metaclass=SingletonMetaclass):
         return self.__dict__['_settings'][key]
 
     def __getattr__(self, name):
-        return self.__dict__['_settings'][name].value
+        # only reached on a miss, e.g. for keys without a descriptor
+        setting = self.__dict__['_settings'].get(name)
+        if setting is None:
+            raise AttributeError(f"'{type(self).__name__}' object has no setting '{name}'")
+        return setting.value
 
     # TODO implement "(python) Emulating container types" methods
 
@@ -171,17 +393,31 @@ class Configuration(metaclass=SingletonMetaclass):
 
         """
 
+        # interned keys let later dict lookups match by identity;
+        # sys.intern() refuses str subclasses such as str-based enums
+        if type(key) is str:
+            key = sys.intern(key)
+
         overwrite = False
         if key in self.__dict__['_settings']:
             overwrite = True
 
-        if key in Configuration.__dict__ and key[:2] != '__':
+        if key in _SHADOW_NAMES:
             warnings.warn(f"[WARNING]: Setting '{key}' shadows a Configuration method of the same name!", ShadowWarning)
 
         setting = Setting(key, default=default, getter=getter, setter=setter)
 
         self.__dict__['_settings'][key] = setting
 
+        # methods and other class attributes take precedence over
+        # Settings of the same name.  Names owned by the metaclass,
+        # such as type.mro or __name__, are left alone too; those
+        # Settings are served by __getattr__.
+        cls = type(self)
+        if (isinstance(key, str) and not _class_defines(cls, key)
+                and not _class_defines(type(cls), key)):
+            setattr(cls, key, _SettingDescriptor(key))
+
         if overwrite:
             warnings.warn(f"[WARNING]: Setting '{key}' was overwritten", OverwriteWarning)
 
@@ -190,10 +426,10 @@ class Configuration(metaclass=SingletonMetaclass):
 
         Parameters
         ----------
-        filename : path, optional
+        filename : path or file object, optional
 
-          Path to configuration file.  Default location is
-          Configuration().config_file.
+          Path to configuration file, or an open text stream to read
+          from.  Default location is Configuration().config_file.
 
         sync : bool, optional
 
@@ -204,18 +440,24 @@ class Configuration(metaclass=SingletonMetaclass):
         if not filename:
             filename = self.config_file
 
-        with open(filename, 'r', encoding='utf-8') as f:
-            text = f.read()
-
-        parser = configparser.ConfigParser()
-        parser.read_string(text)
-
-        for key, setting in self.__dict__['_settings'].items():
-            if parser.has_option('General', key):
-                raw_value = parser['General'][key]
-                value = json.loads(raw_value)
+        if hasattr(filename, 'read'):
+            section = _parse_general(filename)
+        else:
+            # an unchanged file is only parsed once
+            section = _load_general(filename)
+
+        # locals avoid repeated lookups inside the loop
+        settings = self.__dict__['_settings']
+        decode   = _decode
+
+        for key, setting in settings.items():
+            # option names are lowercased by ConfigParser; decode on
+            # every read so that mutable values are never shared
+            raw_value = section.get(key.lower())
+            if raw_value is not None:
+                value = decode(raw_value)
                 setting.value = value
-                if sync and setting.setter:
+                if sync and setting.setter is not None:
                     setting.setter(value)
 
     def write(self, filename=None, sync=True):
@@ -223,10 +465,10 @@ class Configuration(metaclass=SingletonMetaclass):
 
         Parameters
         ----------
-        filename : path, optional
+        filename : path or file object, optional
 
-          Path to configuration file.  Default location is
-          Configuration().config_file.
+          Path to configuration file, or an open text stream to write
+          to.  Default location is Configuration().config_file.
 
         sync : bool, optional
 
@@ -237,21 +479,60 @@ class Configuration(metaclass=SingletonMetaclass):
         if not filename:
             filename = self.config_file
 
-        if not os.path.isdir(os.path.dirname(self.config_file)):
-            os.makedirs(os.path.dirname(self.config_file))
+        # locals avoid repeated lookups inside the loop
+        settings = self.__dict__['_settings']
+        encode   = _encode
 
-        parser = configparser.ConfigParser()
-        parser.add_section('General')
-
-        for key, setting in self.__dict__['_settings'].items():
+        # encode everything before opening the file so that a failing
+        # getter doesn't leave a truncated configuration behind
+        options = {}
+        for key, setting in settings.items():
             if key != 'config_file':
-                if sync and setting.getter:
+                if sync and setting.getter is not None:
                     setting.value = setting.getter()
-                value = json.dumps(setting.value)
-                parser.set('General', key, value)
+                # keys are case-insensitive, as with ConfigParser
+                options[key.lower()] = encode(setting.value)
+
+        if hasattr(filename, 'write'):
+            # the caller owns the stream, so leave it open
+            _write_general(filename, options)
+            return
+
+        # write through symlinks to the file they point at
+        target    = os.path.realpath(filename)
+        directory = os.path.dirname(target)
+
+        # the file may change within the timestamp resolution
+        _PARSE_CACHE.pop(os.path.abspath(filename), None)
+        _PARSE_CACHE.pop(target, None)
+
+        # write alongside the file and swap it in, so that a crash
+        # mid-write can't leave a truncated configuration behind.
+        # Unlike mkstemp(), exclusive creation with open() honours the
+        # umask, as writing the file directly would.
+        temp_file = f"{target}.{uuid.uuid4().hex}.tmp"
+        try:
+            f = open(temp_file, 'x', encoding='utf-8')
+        except FileNotFoundError:
+            # only the first write should need to create the directory
+            os.makedirs(directory, exist_ok=True)
+            f = open(temp_file, 'x', encoding='utf-8')
 
-        with open(self.config_file, 'w+', encoding='utf-8') as f:
-            parser.write(f)
+        try:
+            with f:
+                _write_general(f, options)
+            # keep the permissions of an existing file
+            try:
+                shutil.copymode(target, temp_file)
+            except FileNotFoundError:
+                pass
+            os.replace(temp_file, target)
+        except BaseException:
+            try:
+                os.remove(temp_file)
+            except OSError:
+                pass
+            raise
 
     def get(self, keys=None):
         """Update configuration according to getters.
@@ -272,14 +553,18 @@ class Configuration(metaclass=SingletonMetaclass):
 
         """
 
+        settings = self.__dict__['_settings']
+
         if not keys:
-            keys = self.__dict__['_settings'].keys()
+            items = settings.items()
+        else:
+            items = ((key, settings[key]) for key in keys)
 
         settings_changed = {}
-        for key in keys:
-            setting = self.__dict__['_settings'][key]
-            if setting.getter:
-                new_value = setting.getter()
+        for key, setting in items:
+            getter = setting.getter
+            if getter is not None:
+                new_value = getter()
                 settings_changed[key] = setting.value
                 setting.value = new_value
 
@@ -312,15 +597,23 @@ class Configuration(metaclass=SingletonMetaclass):
 
         """
 
+        settings = self.__dict__['_settings']
+
         if not keys:
-            keys = self.__dict__['_settings'].keys()
+            keys = settings.keys()
 
         for key in keys:
-            setting = self.__dict__['_settings'][key]
-            if setting.setter:
+            setting = settings[key]
+            setter  = setting.setter
+            if setter is not None:
                 if use_defaults:
-                    setting.setter(setting._default)
+                    setter(setting._default)
                     if sync:
                         setting.value = setting._default
                 else:
-                    setting.setter(setting.value)
+                    setter(setting.value)
+
+
+# Configuration attributes a Setting key can shadow.  Computed once,
+# before add_setting() starts binding Setting descriptors to the class.
+_SHADOW_NAMES = frozenset(name for name in vars(Configuration) if name[:2] != '__')
@@ -15,6 +15,15 @@ VERSION = "1.4.0"
 with open("README.md", 'r', encoding="utf-8") as f:
     LONG_DESCRIPTION = f.read()
 
+# Optionally compile the module with Cython in "pure Python" mode.  The
+# plain Python module is always installed alongside as the fallback.
+#
+# $ NOSTALGIC_CYTHONIZE=1 pip install .
+EXT_MODULES = []
+if os.environ.get("NOSTALGIC_CYTHONIZE"):
+    from Cython.Build import cythonize
+    EXT_MODULES = cythonize(["nostalgic/nostalgic.py"], language_level=3)
+
 
 # Arguments marked as "Required" below must be included for upload to PyPI.
 # Fields marked as "Optional" may be commented out.
@@ -131,12 +140,23 @@ setup(
     #
     packages=find_packages(),  # Required
 
+    # Compiled extensions, see EXT_MODULES above.
+    ext_modules=EXT_MODULES,  # Optional
+
     # Specify which Python versions you support. In contrast to the
     # 'Programming Language' classifiers above, 'pip install' will check this
     # and refuse to install the project if the version does not match. See
     # https://packaging.python.org/guides/distributing-packages-using-setuptools/#python-requires
     python_requires=">=3.6",
 
+    # Additional groups of dependencies, e.g. for development.  Install
+    # with:
+    #
+    # $ pip install -e .[test]
+    extras_require={  # Optional
+        "test": ["pytest", "pytest-xdist"],
+    },
+
     # List additional URLs that are relevant to your project as a dict.
     #
     # This field corresponds to the "Project-URL" metadata fields:
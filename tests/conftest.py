@@ -0,0 +1,17 @@
+# conftest.py – Shared pytest fixtures for the Nostalgic test suite
+
+import pytest
+
+import nostalgic
+
+
+# resolved once rather than through name mangling after every test
+_reset = nostalgic.Configuration._SingletonMetaclass__reset
+
+
+@pytest.fixture(autouse=True)
+def reset_configuration():
+    """Run after each test."""
+    yield
+    # clear singleton so that runs are separate
+    _reset()
@@ -1,10 +1,22 @@
 # test_nostalgic.py – Test suite for Nostalgic
 #
-# Run tests with
+# Run tests from the project root with
 #
-#   python test_nostalgic.py
+#   pytest
 #
-# See main() for run options.
+# or spread them across all cores with pytest-xdist:
+#
+#   pytest -n auto
+#
+# The singleton is reset after every test by the autouse fixture in
+# conftest.py, and each xdist worker is its own process, so tests
+# don't leak state into each other.
+#
+# Files are written to unique paths in one session-wide directory
+# (see the cfg_path fixture).  To keep that I/O in memory, point the
+# base temporary directory at a tmpfs:
+#
+#   pytest --basetemp=/dev/shm/pytest-nostalgic
 #
 # NOTE: There isn't an easy way to make an assert statement show what
 # the expected value was using Python.  The only way is to write it
@@ -23,893 +35,1077 @@
 # eval: (evil-set-register ?c [?0 ?w ?w ?\C-v ?/ ?= ?= return ?g ?e ?y ?A ?, ?  escape ?p])
 # End:
 
+"""PYTEST_DONT_REWRITE"""
+
+# The marker above makes pytest skip rewriting this module's asserts,
+# which saves reparsing and recompiling it on collection.  Failing
+# asserts only report the message given to them, hence the manual
+# messages described above.
+
+import io
+import enum
 import os
-import time
-import tempfile
-import warnings
-import traceback
+import sys
+import stat
+import uuid
+import pathlib
+import configparser
+
+import pytest
 
 import nostalgic
 
 
-def main():
-    # Run options:
-    ONLY_SHOW_FAILS = True
-    BREAK_ON_FIRST_FAIL = True
+# resolve the home directory once, as nostalgic itself does
+_HOME = os.path.expanduser('~')
 
-    test_suites = {
-        'setting': TestSetting(),
-        'configuration': TestConfiguration(),
-    }
+# INI file contents shared between tests
+_READ_INI       = b'[General]\nfirst = 1\nsecond = "two"\nthird = 42\nfoo = "was set"'
+_FIRST_ONLY_INI = b"[General]\nfirst = 1\n\n"
 
-    test_functions = [
-        getattr(suite, m)
-        for suite in test_suites.values()
-        for m in dir(suite)
-        if m[:4] == 'test'
-    ]
 
-    tests_to_run = [
-        *test_functions,
-        # test_suites['setting'].test_setter,
-        # test_suites['setting'].test_getter,
-        # test_suites['configuration'].test_setting_value_access,
-        # test_suites['configuration'].test_custom_save_location,
-        # test_suites['configuration'].test_read,
-        # test_suites['configuration'].test_write,
-        # test_suites['configuration'].test_add_setting,
-        # test_suites['configuration'].test_get_calls_getters_separately,
-    ]
+@pytest.fixture(scope="session")
+def general_config_file(tmp_path_factory):
+    """Path to a config file shared by tests that only read it."""
+    config_file = tmp_path_factory.mktemp("config") / "test"
+    config_file.write_bytes(_READ_INI)
+    return str(config_file)
 
-    tests_to_skip = [
-        # test_suites['configuration'].test_read,
-        # test_suites['configuration'].test_write,
-    ]
 
-    tests_to_run = [test for test in tests_to_run if test not in tests_to_skip]
-
-    tests_failed = 0
-    tests_passed = 0
-    tests_run = 0
-    start = time.time()
-
-    # NOTE: tests run in alphabetical ordering not in declared
-    # ordered.  Either implement code introspection to get the order
-    # they're declared in or declare the order explicitly in
-    # tests_to_run.
-    for test in tests_to_run:
-        tests_run += 1
-        if not ONLY_SHOW_FAILS: print(f"----------", flush=True)
-
-        try:
-            if not ONLY_SHOW_FAILS: print(f"  Running: {test.__name__}", flush=True)
-            test()
-            if not ONLY_SHOW_FAILS: print(f"  [PASS]", flush=True)
-            tests_passed += 1
-        except Exception as ex:
-            tests_failed += 1
-            print(f"  [FAIL]: {test.__self__.__class__.__name__}.{test.__name__}\n{ex}", flush=True)
-            print(f"{traceback.format_exc()}", flush=True)
-            if BREAK_ON_FIRST_FAIL:
-                print(f"BROKE ON FIRST FAIL", flush=True)
-                break
-
-        post_test_clean_up()
-
-    stop = time.time()
-    elapsed = stop-start
-    print(f"----------", flush=True)
-    if ONLY_SHOW_FAILS and tests_failed == 0:
-        print(f"  [PASS]", flush=True)
-
-    print(f"Success:{tests_passed}", flush=True)
-    print(f"Fail:\t{tests_failed} ", flush=True)
-    print(f"Total:\t{tests_passed + tests_failed}\tTime: {(elapsed/60):.0f}:{(elapsed%60):.0f}", flush=True)
-
-
-def post_test_clean_up():
-    """Run after each test."""
-    # clear singleton so that runs are separate
-    nostalgic.Configuration._SingletonMetaclass__reset()
+@pytest.fixture
+def my_config():
+    """Configuration at the default location."""
+    return nostalgic.Configuration()
 
 
-class TestSetting:
-    """Setting object test suite."""
+@pytest.fixture(scope="session")
+def shared_tmp(tmp_path_factory):
+    """Directory shared by every test which writes a config file."""
+    return tmp_path_factory.mktemp("nostalgic")
 
-    def test_has_key(self):
-        foo_setting = nostalgic.Setting("foo")
-        assert hasattr(foo_setting, 'key'), "Setting needs a 'key' attribute"
 
-        assert foo_setting.key == "foo", foo_setting.key
+def _leftover_temp_files(config_file):
+    """Names of temporary files write() left next to config_file."""
+    directory, name = os.path.split(config_file)
+    return [entry for entry in os.listdir(directory)
+            if entry.startswith(name + ".") and entry.endswith(".tmp")]
 
-    def test_has_value(self):
-        foo_setting = nostalgic.Setting("foo")
-        assert hasattr(foo_setting, 'value'), "Setting needs a 'value' attribute"
 
-    def test_has_optional_default(self):
-        foo_setting = nostalgic.Setting("foo")
-        assert hasattr(foo_setting, '_default'), "Setting needs a '_default' attribute"
+@pytest.fixture
+def cfg_path(shared_tmp):
+    """Unique config file path below the shared directory.
 
-    def test_default_argument_sets_initial_value(self):
-        foo_setting = nostalgic.Setting("foo", default="bar")
-        assert foo_setting.value == "bar", foo_setting.value
+    Nothing is removed between tests or at the end of the session;
+    pytest keeps the base temporary directories of the last three
+    sessions and removes older ones when a new session starts.
 
-    def test_value_independent_from_default(self):
-        foo_setting = nostalgic.Setting("foo", default="bar")
+    """
+    return str(shared_tmp / uuid.uuid4().hex)
 
-        foo_setting.value = "baz"
 
-        assert foo_setting.value == "baz", foo_setting.value
-        assert foo_setting._default == "bar", foo_setting._default
+# ----------
+# Setting
+# ----------
 
-    def test_has_optional_setter(self):
-        foo_setting = nostalgic.Setting("foo")
-        assert hasattr(foo_setting, "setter"), "Setting needs a 'setter' attribute"
+def test_setting__has_key():
+    foo_setting = nostalgic.Setting("foo")
+    assert hasattr(foo_setting, 'key'), "Setting needs a 'key' attribute"
 
-    def test_setter_sets_external_variable_only(self):
-        self.ui_element = "not set"
+    assert foo_setting.key == "foo", foo_setting.key
 
-        def custom_setter(value):
-            self.ui_element = value
 
-        foo_setting = nostalgic.Setting("foo", default="foo default", setter=custom_setter)
+def test_setting__has_value():
+    foo_setting = nostalgic.Setting("foo")
+    assert hasattr(foo_setting, 'value'), "Setting needs a 'value' attribute"
 
-        assert self.ui_element == "not set", self.ui_element
-        assert foo_setting.value == "foo default", foo_setting.value
 
-        foo_setting.setter("value was set")
+def test_setting__has_optional_default():
+    foo_setting = nostalgic.Setting("foo")
+    assert hasattr(foo_setting, '_default'), "Setting needs a '_default' attribute"
 
-        assert self.ui_element == "value was set", self.ui_element
-        assert foo_setting.value == "foo default", foo_setting.value
 
-    def test_has_optional_getter(self):
-        foo_setting = nostalgic.Setting("foo")
-        assert hasattr(foo_setting, "getter"), "Setting needs a 'getter' attribute"
+def test_setting__default_argument_sets_initial_value():
+    foo_setting = nostalgic.Setting("foo", default="bar")
+    assert foo_setting.value == "bar", foo_setting.value
 
-    def test_getter_gets_external_variable_only(self):
-        self.ui_element = "ui element value"
 
-        def custom_getter():
-            return self.ui_element
+def test_setting__value_independent_from_default():
+    foo_setting = nostalgic.Setting("foo", default="bar")
 
-        foo_setting = nostalgic.Setting("foo", default="bar", getter=custom_getter)
+    foo_setting.value = "baz"
 
-        assert foo_setting.getter() == "ui element value", foo_setting.getter()
-        assert foo_setting.value == "bar", foo_setting.value
+    assert foo_setting.value == "baz", foo_setting.value
+    assert foo_setting._default == "bar", foo_setting._default
 
 
-class TestConfiguration:
-    """Configuration object test suite."""
+def test_setting__has_optional_setter():
+    foo_setting = nostalgic.Setting("foo")
+    assert hasattr(foo_setting, "setter"), "Setting needs a 'setter' attribute"
 
-    def test_only_a_single_configuration_object_can_be_made(self):
-        my_config    = nostalgic.Configuration()
-        other_config = nostalgic.Configuration()
 
-        assert my_config == other_config, f"All configurations should be the same object\n{my_config=}\n{other_config=}"
+def test_setting__setter_sets_external_variable_only():
+    ui_element = "not set"
 
-    def test_default_save_location(self):
-        my_config             = nostalgic.Configuration()
-        home_directory        = os.path.expanduser('~')
-        default_save_location = os.path.join(home_directory, 'test_nostalgic_config')
+    def custom_setter(value):
+        nonlocal ui_element
+        ui_element = value
 
-        assert my_config.config_file == default_save_location, my_config.config_file
+    foo_setting = nostalgic.Setting("foo", default="foo default", setter=custom_setter)
 
-    def test_custom_save_location(self):
-        with tempfile.NamedTemporaryFile() as temp_file:
-            my_config = nostalgic.Configuration(temp_file.name)
+    assert ui_element == "not set", ui_element
+    assert foo_setting.value == "foo default", foo_setting.value
 
-            assert my_config.config_file == temp_file.name, my_config.config_file
+    foo_setting.setter("value was set")
 
-    def test_has_add_setting_method(self):
-        my_config = nostalgic.Configuration()
+    assert ui_element == "value was set", ui_element
+    assert foo_setting.value == "foo default", foo_setting.value
 
-        assert hasattr(my_config, 'add_setting')
-        assert callable(my_config.add_setting)
 
-    def test_attribute_assignment_sets_setting_value(self):
-        my_config = nostalgic.Configuration()
-        my_config.add_setting("foo")
+def test_setting__has_optional_getter():
+    foo_setting = nostalgic.Setting("foo")
+    assert hasattr(foo_setting, "getter"), "Setting needs a 'getter' attribute"
 
-        my_config.foo = 42
 
-        # test that the setting object isn't replaced by the assigned value
-        assert isinstance(my_config.__dict__['_settings']['foo'], nostalgic.Setting)
-        assert isinstance(my_config["foo"], nostalgic.Setting)
+def test_setting__getter_gets_external_variable_only():
+    ui_element = "ui element value"
 
-        # test that the value was actually set in the Setting object
-        assert my_config.__dict__['_settings']['foo'].value == 42, my_config.__dict__['_settings']['foo'].value
-        assert my_config.foo == 42, my_config.foo
+    def custom_getter():
+        return ui_element
 
-    def test_only_declared_settings_can_be_assigned_a_value(self):
-        my_config = nostalgic.Configuration()
+    foo_setting = nostalgic.Setting("foo", default="bar", getter=custom_getter)
 
-        # NOTE: A try-except-else won't work here.  "The optional else
-        # clause is executed if the control flow leaves the try suite,
-        # NO EXCEPTION WAS RAISED, and no return, continue, or break
-        # statement was executed."  A KeyError comes from the lookup
-        # in self.__dict__['_settings'].  Since a KeyError exception
-        # is raised, the else is never executed and it's the KeyError
-        # that bubbles up.
-        try:
-            try:
-                my_config.banana = "Rama"
-            except AttributeError:
-                pass
-        except KeyError:
-            raise AssertionError(
-                "No setting defined causing a KeyError. "
-                "However, since user made the assignment using an attribute, "
-                "an AttributeError should be thrown instead of KeyError.")
+    assert foo_setting.getter() == "ui element value", foo_setting.getter()
+    assert foo_setting.value == "bar", foo_setting.value
 
-    def test_add_setting__adds_a_setting_object(self):
-        my_config = nostalgic.Configuration()
-
-        my_config.add_setting("foo")
-        assert isinstance(my_config.__dict__['_settings']["foo"], nostalgic.Setting)
-
-    def test_add_setting__overwriting_setting_raises_warning(self):
-        my_config = nostalgic.Configuration()
-        my_config.add_setting("foo")
-
-        with warnings.catch_warnings() as w:
-            warnings.filterwarnings("error")
-            try:
-                my_config.add_setting("foo", default="banana")
-            except nostalgic.OverwriteWarning:
-                pass
-            else:
-                raise AssertionError("Overwriting a setting does not raise a warning!")
-
-    def test_add_setting__shadow_class_method_with_setting_of_same_name_throws_warning(self):
-        my_config = nostalgic.Configuration()
-
-        with warnings.catch_warnings() as w:
-            warnings.filterwarnings("error")
-            try:
-                my_config.add_setting("add_setting", default="banana")
-            except nostalgic.ShadowWarning:
-                pass
-            else:
-                raise AssertionError("Shadowing a bound method does not raise a warning!")
-
-    def test_add_setting__shadow_class_method_with_setting_of_same_name_returns_method(self):
-        # NOTE: How should we handle the edge case where a user
-        # creates a Setting whose key is the same as a Configuration
-        # method?  With the implementation at the time of writing
-        # (using __getattr__ to return Setting values), you might
-        # expect the Setting to clobber the method. It turns out
-        # that's not the case–the method takes precedence.  Is it
-        # worth the time to correct that for the sake of conceptual
-        # purity?  Probably not. Instead, throw a warning to let the
-        # developer know and document the design.  Test to make sure
-        # that this "default behavior" doesn't change from beneath us.
-        #
-        # See: https://tenthousandmeters.com/blog/python-behind-the-scenes-7-how-python-attributes-work/
-        my_config = nostalgic.Configuration()
 
-        my_config.add_setting("add_setting", default="banana")
+def test_setting__has_no_instance_dict():
+    # Settings are declared in bulk and walked on every read() and
+    # write(); slots keep them small and attribute access fast
+    foo_setting = nostalgic.Setting("foo")
+    assert not hasattr(foo_setting, '__dict__'), foo_setting.__dict__
+
+
+# ----------
+# Configuration
+# ----------
 
-        # shadowed methods return the method, not the Setting
-        assert my_config.add_setting == nostalgic.Configuration().add_setting, my_config.add_setting
+def test_only_a_single_configuration_object_can_be_made():
+    my_config    = nostalgic.Configuration()
+    other_config = nostalgic.Configuration()
 
-        # if the user wants to shadow a method, they can reach into
-        # the _settings dict to get the value
-        assert my_config._settings['add_setting'].value == "banana", my_config._settings['add_setting'].value
+    assert my_config == other_config, f"All configurations should be the same object\n{my_config=}\n{other_config=}"
 
-    def test_add_setting__takes_optional_setter(self):
-        my_config = nostalgic.Configuration()
 
-        def custom_setter(value):
-            pass
+def test_default_save_location(monkeypatch):
+    # the default name comes from the running script, which under
+    # pytest is pytest itself
+    monkeypatch.setattr(sys, 'argv', ['test_nostalgic.py'])
 
-        my_config.add_setting("foo", setter=custom_setter)
-        assert my_config["foo"].setter == custom_setter, my_config["foo"].setter
+    my_config             = nostalgic.Configuration()
+    default_save_location = os.path.join(_HOME, 'test_nostalgic_config')
 
-    def test_add_setting__takes_optional_getter(self):
-        my_config = nostalgic.Configuration()
+    assert my_config.config_file == default_save_location, my_config.config_file
 
-        def custom_getter():
-            pass
 
-        my_config.add_setting("foo", getter=custom_getter)
-        assert my_config["foo"].getter == custom_getter, my_config["foo"].getter
+def test_default_save_location__keeps_the_whole_dotted_name(monkeypatch, tmp_path):
+    monkeypatch.setattr(nostalgic.nostalgic, '_HOME', str(tmp_path))
+    monkeypatch.setattr(sys, 'argv', ['my.app.py'])
 
-    def test_has_read_method(self):
-        my_config = nostalgic.Configuration()
+    my_config = nostalgic.Configuration()
 
-        assert hasattr(my_config, 'read')
-        assert callable(my_config.read)
+    assert my_config.config_file == str(tmp_path / 'my.app_config'), my_config.config_file
 
-    def test_read__loads_declared_settings_from_disk(self):
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_file = os.path.join(temp_dir, "test")
 
-            with open(temp_file, 'w', encoding='utf-8') as f:
-                test_config = "[General]\nfirst = 1\nsecond = \"two\""
-                f.write(test_config)
+def test_default_save_location__falls_back_to_an_existing_legacy_file(monkeypatch, tmp_path):
+    # earlier versions cut dotted script names at the first '.'
+    (tmp_path / 'my_config').write_bytes(b"[General]\n")
+    monkeypatch.setattr(nostalgic.nostalgic, '_HOME', str(tmp_path))
+    monkeypatch.setattr(sys, 'argv', ['my.app.py'])
 
-            my_config = nostalgic.Configuration(temp_file)
+    my_config = nostalgic.Configuration()
 
-            my_config.read()
+    assert my_config.config_file == str(tmp_path / 'my_config'), my_config.config_file
 
-            # prove that nothing was read from disk into the
-            # configuration
-            assert 'first' not in my_config._settings
-            assert 'second' not in my_config._settings
 
-            my_config.add_setting("first")
-            my_config.add_setting("second")
+def test_custom_save_location(cfg_path):
+    my_config = nostalgic.Configuration(cfg_path)
 
-            # confirm that the newly added settings are blank
-            assert my_config.first is None
-            assert my_config.second is None
+    assert my_config.config_file == cfg_path, my_config.config_file
 
-            my_config.read()
 
-            # now that the settings are declared, they are read in
-            assert my_config.first == 1, my_config.first
-            assert my_config.second == "two", my_config.second
+def test_has_public_methods(my_config):
+    for name in ('add_setting', 'read', 'write', 'get', 'set'):
+        assert hasattr(my_config, name), name
+        assert callable(getattr(my_config, name)), name
 
-    def test_read__calls_setters_by_default(self):
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_file = os.path.join(temp_dir, "test")
 
-            with open(temp_file, 'w', encoding='utf-8') as f:
-                test_config = "[General]\nthird = 42"
-                f.write(test_config)
+def test_attribute_assignment_sets_setting_value(my_config):
+    my_config.add_setting("foo")
 
-            my_config = nostalgic.Configuration(temp_file)
+    my_config.foo = 42
 
-            self.fake_ui_element = 0
+    # test that the setting object isn't replaced by the assigned value
+    assert isinstance(my_config.__dict__['_settings']['foo'], nostalgic.Setting), my_config.__dict__['_settings']['foo']
+    assert isinstance(my_config["foo"], nostalgic.Setting), my_config["foo"]
 
-            def custom_setter(value):
-                self.fake_ui_element = value
+    # test that the value was actually set in the Setting object
+    assert my_config.__dict__['_settings']['foo'].value == 42, my_config.__dict__['_settings']['foo'].value
+    assert my_config.foo == 42, my_config.foo
 
-            my_config.add_setting('third', setter=custom_setter)
 
-            assert my_config.third is None
-            assert self.fake_ui_element == 0, self.fake_ui_element
+def test_attribute_access_reflects_setting_object(my_config):
+    my_config.add_setting("foo", default="bar")
 
-            my_config.read()
+    my_config["foo"].value = "baz"
 
-            # confirm setting was read
-            assert my_config.third == 42, my_config.third
-            # confirm setter was called
-            assert self.fake_ui_element == 42, self.fake_ui_element
+    assert my_config.foo == "baz", my_config.foo
 
-    def test_read__can_disable_calling_setters(self):
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_file = os.path.join(temp_dir, "test")
 
-            with open(temp_file, 'w', encoding='utf-8') as f:
-                test_config = "[General]\nfoo = \"was set\""
-                f.write(test_config)
+def test_undeclared_settings_raise_attribute_error(my_config):
+    assert not hasattr(my_config, "banana"), "undeclared setting reachable as attribute"
+    assert getattr(my_config, "banana", "Rama") == "Rama", getattr(my_config, "banana", "Rama")
 
-            my_config = nostalgic.Configuration(temp_file)
 
-            # test that calling setters can be disabled
-            self.ui_foo = "not set"
-            def set_ui_foo(value):
-                self.ui_foo = value
+def test_settings_named_like_metaclass_attributes_are_reachable(my_config):
+    # type attributes are visible on the class but not on instances
+    for key in ("mro", "__name__", "__qualname__", "__mro__"):
+        my_config.add_setting(key, default=key + " value")
+        assert getattr(my_config, key) == key + " value", getattr(my_config, key)
 
-            my_config.add_setting("foo", default="default", setter=set_ui_foo)
+    # the class itself is left untouched
+    assert nostalgic.Configuration.mro()[0] is nostalgic.Configuration, nostalgic.Configuration.mro()
+    assert nostalgic.Configuration.__name__ == "Configuration", nostalgic.Configuration.__name__
+    assert nostalgic.Configuration.__qualname__ == "Configuration", nostalgic.Configuration.__qualname__
+    assert nostalgic.Configuration.__mro__[0] is nostalgic.Configuration, nostalgic.Configuration.__mro__
 
-            assert self.ui_foo == "not set", self.ui_foo
-            assert my_config.foo == "default", my_config.foo
 
-            my_config.read(sync=False)
+def test_settings_do_not_outlive_their_configuration():
+    my_config = nostalgic.Configuration()
+    my_config.add_setting("foo", default="bar")
 
-            # only the configuration should have changed
-            assert self.ui_foo == "not set", self.ui_foo
-            assert my_config.foo == "was set", my_config.foo
+    nostalgic.Configuration._SingletonMetaclass__reset()
+    new_config = nostalgic.Configuration()
 
-    def test_has_write_method(self):
-        my_config = nostalgic.Configuration()
+    assert my_config.foo == "bar", my_config.foo
+    with pytest.raises(AttributeError, match="has no setting 'foo'"):
+        new_config.foo
 
-        assert hasattr(my_config, 'write')
-        assert callable(my_config.write)
 
-    def test_write__saves_settings_to_disk(self):
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_file = os.path.join(temp_dir, "test")
-            my_config = nostalgic.Configuration(temp_file)
+def test_only_declared_settings_can_be_assigned_a_value(my_config):
+    # the KeyError from the lookup in __dict__['_settings'] must not
+    # leak out; assigning via an attribute raises AttributeError
+    with pytest.raises(AttributeError):
+        my_config.banana = "Rama"
 
-            # make sure the test directory/file doesn't already exist
-            assert not os.path.isdir(my_config.config_file)
-            assert not os.path.exists(my_config.config_file)
 
-            my_config.add_setting("first", default=1)
-            my_config.add_setting("second", default="two")
+def test_add_setting__adds_a_setting_object(my_config):
+    my_config.add_setting("foo")
+    assert isinstance(my_config.__dict__['_settings']["foo"], nostalgic.Setting), my_config.__dict__['_settings']['foo']
 
-            my_config.write()
 
-            # check that a file was created
-            assert os.path.exists(my_config.config_file)
+def test_add_setting__accepts_str_subclass_keys(cfg_path):
+    class Key(str, enum.Enum):
+        THEME = "theme"
 
-            # check file contents
-            with open(my_config.config_file, 'r', encoding='utf-8') as f:
-                text = f.read()
+    config = nostalgic.Configuration(cfg_path)
+    config.add_setting(Key.THEME, default="dark")
+    config.write()
 
-            # configparser writes putting two new lines at the end of the
-            # file (one for the end line, one for end of file(?)).  I'm
-            # not going to fight with that; just test for it.
-            #
-            # NOTE: we choose not to write the default settings
-            # (e.g. config_file) to disk
-            assert text == "[General]\nfirst = 1\nsecond = \"two\"\n\n", text
+    with open(cfg_path) as f:
+        assert 'theme = "dark"' in f.read(), "str-enum key not written by value"
 
-    def test_write__calls_getters_by_default(self):
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_file = os.path.join(temp_dir, "test")
-            my_config = nostalgic.Configuration(temp_file)
 
-            def custom_getter():
-                return "baz"
+def test_add_setting__overwriting_setting_raises_warning(my_config):
+    my_config.add_setting("foo")
 
-            my_config.add_setting("foo", default="bar", getter=custom_getter)
-            assert my_config.foo ==  "bar", my_config.third
+    with pytest.warns(nostalgic.OverwriteWarning):
+        my_config.add_setting("foo", default="banana")
 
-            my_config.write()
 
-            with open(my_config.config_file, 'r', encoding='utf-8') as f:
-                text = f.read()
+def test_add_setting__shadow_class_method_with_setting_of_same_name_throws_warning(my_config):
+    with pytest.warns(nostalgic.ShadowWarning):
+        my_config.add_setting("add_setting", default="banana")
 
-            assert text == "[General]\nfoo = \"baz\"\n\n", text
-            assert my_config.foo == "baz", my_config.foo
 
-    def test_write__can_disable_calling_getters(self):
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_file = os.path.join(temp_dir, "test")
-            my_config = nostalgic.Configuration(temp_file)
+def test_add_setting__shadow_class_method_with_setting_of_same_name_returns_method(my_config):
+    # NOTE: How should we handle the edge case where a user
+    # creates a Setting whose key is the same as a Configuration
+    # method?  With the implementation at the time of writing
+    # (using __getattr__ to return Setting values), you might
+    # expect the Setting to clobber the method. It turns out
+    # that's not the case–the method takes precedence.  Is it
+    # worth the time to correct that for the sake of conceptual
+    # purity?  Probably not. Instead, throw a warning to let the
+    # developer know and document the design.  Test to make sure
+    # that this "default behavior" doesn't change from beneath us.
+    #
+    # See: https://tenthousandmeters.com/blog/python-behind-the-scenes-7-how-python-attributes-work/
+
+    with pytest.warns(nostalgic.ShadowWarning):
+        my_config.add_setting("add_setting", default="banana")
 
-            def getter_that_gets_disabled():
-                return "getter called when it shouldn't have been"
+    # shadowed methods return the method, not the Setting
+    assert my_config.add_setting.__func__ is nostalgic.Configuration.add_setting, my_config.add_setting
 
-            my_config.add_setting(
-                "test_sync_disable",
-                default="default",
-                getter=getter_that_gets_disabled)
+    # if the user wants to shadow a method, they can reach into
+    # the _settings dict to get the value
+    assert my_config._settings['add_setting'].value == "banana", my_config._settings['add_setting'].value
 
-            assert my_config.test_sync_disable == "default", my_config.test_sync_disable
 
-            my_config.write(sync=False)
+def test_add_setting__takes_optional_setter(my_config):
+    def custom_setter(value):
+        pass
 
-            assert my_config.test_sync_disable == "default", my_config.test_sync_disable
+    my_config.add_setting("foo", setter=custom_setter)
+    assert my_config["foo"].setter == custom_setter, my_config["foo"].setter
 
-    def test_write__config_file_is_created_if_none_exists(self):
-        non_temp_configuration = nostalgic.Configuration("test_config_file_right_here_please_delete")
 
-        # if filename has no directory, then directory creation code
-        # fails.  also, if the user gave the config_file relative to the
-        # current directory, the current directory could change and a
-        # second configuration be written. Prevent these by storing
-        # absolute path.
-        assert non_temp_configuration.config_file == os.path.abspath("test_config_file_right_here_please_delete"), non_temp_configuration.config_file
+def test_add_setting__takes_optional_getter(my_config):
+    def custom_getter():
+        pass
 
-        assert not os.path.exists(non_temp_configuration.config_file), \
-            (f"Config file '{non_temp_configuration.config_file}' exists when it should not. "
-             f"Maybe it's left over from a failed run?  Delete it and try again.")
+    my_config.add_setting("foo", getter=custom_getter)
+    assert my_config["foo"].getter == custom_getter, my_config["foo"].getter
 
-        non_temp_configuration.add_setting("test", default=True)
 
-        warnings.warn(
-            (f"[WARNING]: Created non-temp file: "
-             f"'{os.path.abspath(non_temp_configuration.config_file)}'"))
-        non_temp_configuration.write()
+def test_read__loads_declared_settings_from_disk(general_config_file):
+    my_config = nostalgic.Configuration(general_config_file)
 
-        assert os.path.exists(non_temp_configuration.config_file)
+    my_config.read()
 
-        with open(non_temp_configuration.config_file, 'r', encoding='utf-8') as f:
-            text = f.read()
+    # prove that nothing was read from disk into the
+    # configuration
+    assert 'first' not in my_config._settings, my_config._settings
+    assert 'second' not in my_config._settings, my_config._settings
 
-        assert text == "[General]\ntest = true\n\n", text
+    my_config.add_setting("first")
+    my_config.add_setting("second")
 
-        # Clean up
-        # NOTE: Clean up won't happen on failure
-        os.remove(non_temp_configuration.config_file)
-        if os.path.exists(non_temp_configuration.config_file):
-            warnings.warn(f"[WARNING]: Failed to remove: '{non_temp_configuration.config_file}'")
+    # confirm that the newly added settings are blank
+    assert my_config.first is None, my_config.first
+    assert my_config.second is None, my_config.second
 
-    def test_has_get_method(self):
-        my_config = nostalgic.Configuration()
+    my_config.read()
 
-        assert hasattr(my_config, 'get')
-        assert callable(my_config.get)
+    # now that the settings are declared, they are read in
+    assert my_config.first == 1, my_config.first
+    assert my_config.second == "two", my_config.second
 
-    def test_get__takes_list_of_settings_and_calls_their_getters(self):
-        my_config = nostalgic.Configuration()
 
-        self.ui_element_1 = "got 1"
+def test_read__calls_setters_by_default(general_config_file):
+    my_config = nostalgic.Configuration(general_config_file)
 
-        def get_element_1():
-            return self.ui_element_1
+    fake_ui_element = 0
 
-        my_config.add_setting("element_1", default="not got 1", getter=get_element_1)
+    def custom_setter(value):
+        nonlocal fake_ui_element
+        fake_ui_element = value
 
-        assert self.ui_element_1 == "got 1", self.ui_element_1
-        assert my_config.element_1 == "not got 1", my_config.element_1
+    my_config.add_setting('third', setter=custom_setter)
 
-        my_config.get(["element_1"])
+    assert my_config.third is None, my_config.third
+    assert fake_ui_element == 0, fake_ui_element
 
-        assert my_config.element_1 == "got 1", my_config.element_1
+    my_config.read()
 
-    def test_get__calls_getters_separately(self):
-        my_config = nostalgic.Configuration()
+    # confirm setting was read
+    assert my_config.third == 42, my_config.third
+    # confirm setter was called
+    assert fake_ui_element == 42, fake_ui_element
 
-        self.ui_element_1 = "got 1"
-        self.ui_element_2 = "got 2"
 
-        def get_element_1():
-            return self.ui_element_1
+def test_read__can_disable_calling_setters(general_config_file):
+    my_config = nostalgic.Configuration(general_config_file)
 
-        def get_element_2():
-            return self.ui_element_2
+    # test that calling setters can be disabled
+    ui_foo = "not set"
+    def set_ui_foo(value):
+        nonlocal ui_foo
+        ui_foo = value
 
-        assert self.ui_element_1 == "got 1", self.ui_element_1
-        assert self.ui_element_2 == "got 2", self.ui_element_2
+    my_config.add_setting("foo", default="default", setter=set_ui_foo)
 
-        my_config.add_setting("element_1", default="not got 1", getter=get_element_1)
-        my_config.add_setting("element_2", default="not got 2", getter=get_element_2)
+    assert ui_foo == "not set", ui_foo
+    assert my_config.foo == "default", my_config.foo
 
-        assert my_config.element_1 == "not got 1", my_config.element_1
-        assert my_config.element_2 == "not got 2", my_config.element_2
+    my_config.read(sync=False)
 
-        my_config.get(["element_2"])
+    # only the configuration should have changed
+    assert ui_foo == "not set", ui_foo
+    assert my_config.foo == "was set", my_config.foo
 
-        assert my_config.element_1 == "not got 1", my_config.element_1
-        assert my_config.element_2 == "got 2", my_config.element_2
 
-    def test_get__can_get_multiple_settings_at_once(self):
-        my_config = nostalgic.Configuration()
+def test_read__accepts_an_open_stream(cfg_path):
+    my_config = nostalgic.Configuration(cfg_path)
+    my_config.add_setting("first")
+    my_config.add_setting("second")
 
-        self.ui_element_1 = "got 1"
-        self.ui_element_2 = "got 2"
+    my_config.read(io.StringIO(_READ_INI.decode()))
 
-        def get_element_1():
-            return self.ui_element_1
+    assert my_config.first == 1, my_config.first
+    assert my_config.second == "two", my_config.second
 
-        def get_element_2():
-            return self.ui_element_2
+    # nothing is read from config_file
+    assert not os.path.exists(my_config.config_file), my_config.config_file
 
-        my_config.add_setting("element_1", default="not got 1", getter=get_element_1)
-        my_config.add_setting("element_2", default="not got 2", getter=get_element_2)
 
-        assert self.ui_element_1 == "got 1", self.ui_element_1
-        assert self.ui_element_2 == "got 2", self.ui_element_2
+def test_read__follows_configparser_syntax(my_config):
+    for key in ("first", "second", "third", "fourth", "fifth"):
+        my_config.add_setting(key)
 
-        assert my_config.element_1 == "not got 1", my_config.element_1
-        assert my_config.element_2 == "not got 2", my_config.element_2
+    my_config.read(io.StringIO(
+        "; comment\n"
+        "[DEFAULT]\n"
+        "fifth = 5\n"
+        "[General]\n"
+        "# comment\n"
+        "FIRST = 1\n"
+        "second: \"two\"\n"
+        "third = [1,\n"
+        "    2]\n"
+        "\n"
+        "[Other]\n"
+        "fourth = 4\n"))
 
-        my_config.get(["element_1", "element_2"])
+    assert my_config.first == 1, my_config.first
+    assert my_config.second == "two", my_config.second
+    assert my_config.third == [1, 2], my_config.third
+    assert my_config.fourth is None, my_config.fourth
+    assert my_config.fifth == 5, my_config.fifth
 
-        assert my_config.element_1 == "got 1", my_config.element_1
-        assert my_config.element_2 == "got 2", my_config.element_2
 
-    def test_get__return_value_is_the_setting_value_before_the_get(self):
-        my_config = nostalgic.Configuration()
+def test_read__values_decode_as_json(my_config):
+    cases = {
+        'true': True, 'false': False, 'null': None,
+        '0': 0, '-12': -12, '1.5': 1.5,
+        '""': "", '"two"': "two", '"say \\"hi\\""': 'say "hi"',
+        '"caf\\u00e9"': "caf\u00e9", '[1, "a"]': [1, "a"],
+    }
 
-        self.ui_element_1 = "got 1"
-        self.ui_element_2 = "got 2"
+    my_config.add_setting("value")
 
-        def get_element_1():
-            return self.ui_element_1
+    for raw, expected in cases.items():
+        my_config.read(io.StringIO(f"[General]\nvalue = {raw}\n"))
+        assert my_config.value == expected, (raw, my_config.value)
+        assert type(my_config.value) is type(expected), (raw, my_config.value)
 
-        def get_element_2():
-            return self.ui_element_2
+    # not JSON, although int() or Python would accept them
+    for raw in ('007', '\u0661', "'single'"):
+        with pytest.raises(ValueError):
+            my_config.read(io.StringIO(f"[General]\nvalue = {raw}\n"))
 
-        my_config.add_setting("element_1", default="not got 1", getter=get_element_1)
-        my_config.add_setting("element_2", default="not got 2", getter=get_element_2)
 
-        assert self.ui_element_1 == "got 1", self.ui_element_1
-        assert self.ui_element_2 == "got 2", self.ui_element_2
+def test_read__malformed_files_raise_configparser_errors(my_config):
+    with pytest.raises(configparser.MissingSectionHeaderError):
+        my_config.read(io.StringIO("first = 1\n"))
 
-        assert my_config.element_1 == "not got 1", my_config.element_1
-        assert my_config.element_2 == "not got 2", my_config.element_2
+    with pytest.raises(configparser.ParsingError):
+        my_config.read(io.StringIO("[General]\nfirst\n"))
 
-        rv = my_config.get(["element_1", "element_2"])
+    with pytest.raises(configparser.DuplicateOptionError):
+        my_config.read(io.StringIO("[General]\nfirst = 1\nFirst = 2\n"))
 
-        assert rv == {"element_1": "not got 1", "element_2": "not got 2"}, rv
 
-    def test_get__settings_without_getters_dont_cause_problems(self):
-        my_config = nostalgic.Configuration()
+def test_read__sees_changes_made_to_the_file(cfg_path):
+    my_config = nostalgic.Configuration(cfg_path)
+    my_config.add_setting("first")
 
-        self.ui_element_1 = "got 1"
-        self.ui_element_2 = "got 2"
+    # backdate the file so that the read is cached
+    pathlib.Path(cfg_path).write_bytes(b"[General]\nfirst = 1\n")
+    os.utime(cfg_path, ns=(0, 1_000_000_000))
+    my_config.read()
+    assert my_config.first == 1, my_config.first
+    assert os.path.abspath(cfg_path) in nostalgic.nostalgic._PARSE_CACHE, \
+        "settled file was not cached"
 
-        def get_element_1():
-            return self.ui_element_1
+    # changed behind our back, keeping the size
+    pathlib.Path(cfg_path).write_bytes(b"[General]\nfirst = 9\n")
+    os.utime(cfg_path, ns=(0, 2_000_000_000))
+    my_config.read()
+    assert my_config.first == 9, my_config.first
 
-        def get_element_2():
-            return self.ui_element_2
+    # changed by write()
+    my_config.first = 2
+    my_config.write()
+    my_config.first = None
+    my_config.read()
+    assert my_config.first == 2, my_config.first
 
-        my_config.add_setting("element_1", default="not got 1", getter=get_element_1)
-        my_config.add_setting("element_2", default="not got 2", getter=get_element_2)
-        my_config.add_setting("no_getter", default="should not have got")
 
-        assert my_config.no_getter == "should not have got", my_config.no_getter
+def test_read__does_not_cache_a_freshly_modified_file(cfg_path):
+    my_config = nostalgic.Configuration(cfg_path)
+    my_config.add_setting("first")
 
-        rv = my_config.get(["no_getter"])
+    # its mtime could still be shared by a later same-size edit
+    pathlib.Path(cfg_path).write_bytes(b"[General]\nfirst = 1\n")
+    my_config.read()
+    assert os.path.abspath(cfg_path) not in nostalgic.nostalgic._PARSE_CACHE, \
+        "racily clean file was cached"
 
-        assert rv == {}, rv
 
-    def test_get__passing_in_nothing_calls_all_getters(self):
-        my_config = nostalgic.Configuration()
+def test_read__values_are_not_shared_between_reads(cfg_path):
+    my_config = nostalgic.Configuration(cfg_path)
+    my_config.add_setting("items")
 
-        self.ui_element_1 = "got 1"
-        self.ui_element_2 = "got 2"
+    pathlib.Path(cfg_path).write_bytes(b"[General]\nitems = [1, 2]\n")
+    my_config.read()
+    my_config.items.append(3)
+    my_config.read()
 
-        def get_element_1():
-            return self.ui_element_1
+    assert my_config.items == [1, 2], my_config.items
 
-        def get_element_2():
-            return self.ui_element_2
 
-        my_config.add_setting("element_1", default="not got 1", getter=get_element_1)
-        my_config.add_setting("element_2", default="not got 2", getter=get_element_2)
-        my_config.add_setting("no_getter", default="should not have got")
+def test_write__saves_settings_to_disk(cfg_path):
+    my_config = nostalgic.Configuration(cfg_path)
 
-        my_config.get()
+    # make sure the test directory/file doesn't already exist
+    assert not os.path.isdir(my_config.config_file), my_config.config_file
+    assert not os.path.exists(my_config.config_file), my_config.config_file
 
-        assert my_config.element_1 == "got 1", my_config.element_1
-        assert my_config.element_2 == "got 2", my_config.element_2
+    my_config.add_setting("first", default=1)
+    my_config.add_setting("second", default="two")
 
-    def test_has_set(self):
-        my_config = nostalgic.Configuration()
+    my_config.write()
 
-        assert hasattr(my_config, 'set')
-        assert callable(my_config.set)
+    # check that a file was created
+    assert os.path.exists(my_config.config_file), my_config.config_file
 
-    def test_set__takes_list_of_settings_and_calls_their_setters(self):
-        my_config = nostalgic.Configuration()
+    # check file contents
+    text = pathlib.Path(my_config.config_file).read_bytes()
 
-        self.element_1 = "not set 1"
+    # configparser writes putting two new lines at the end of the
+    # file (one for the end line, one for end of file(?)).  I'm
+    # not going to fight with that; just test for it.
+    #
+    # NOTE: we choose not to write the default settings
+    # (e.g. config_file) to disk
+    assert text == b"[General]\nfirst = 1\nsecond = \"two\"\n\n", text
 
-        def set_element_1(value):
-            self.element_1 = value
+    # written through a temporary file, which doesn't stay behind
+    assert _leftover_temp_files(my_config.config_file) == [], _leftover_temp_files(my_config.config_file)
 
-        my_config.add_setting("element_1", default="default 1", setter=set_element_1)
 
-        assert self.element_1 == "not set 1", self.element_1
-        assert my_config.element_1 == "default 1", my_config.element_1
+def test_write__calls_getters_by_default(cfg_path):
+    my_config = nostalgic.Configuration(cfg_path)
 
-        my_config.set(["element_1"])
+    def custom_getter():
+        return "baz"
 
-        assert self.element_1 == "default 1", self.element_1
-        assert my_config.element_1 == "default 1", my_config.element_1
+    my_config.add_setting("foo", default="bar", getter=custom_getter)
+    assert my_config.foo ==  "bar", my_config.third
 
-    def test_set__calls_setters_separately(self):
-        my_config = nostalgic.Configuration()
+    my_config.write()
 
-        self.element_1 = "not set 1"
-        self.element_2 = "not set 2"
+    text = pathlib.Path(my_config.config_file).read_bytes()
 
-        def set_element_1(value):
-            self.element_1 = value
+    assert text == b"[General]\nfoo = \"baz\"\n\n", text
+    assert my_config.foo == "baz", my_config.foo
 
-        def set_element_2(value):
-            self.element_2 = value
 
-        assert self.element_1 == "not set 1", self.element_1
-        assert self.element_2 == "not set 2", self.element_2
+def test_write__can_disable_calling_getters(cfg_path):
+    my_config = nostalgic.Configuration(cfg_path)
 
-        my_config.add_setting("element_1", default="default 1", setter=set_element_1)
-        my_config.add_setting("element_2", default="default 2", setter=set_element_2)
+    def getter_that_gets_disabled():
+        return "getter called when it shouldn't have been"
 
-        # adding settings sets default value
-        assert my_config.element_1 == "default 1", my_config.element_1
-        assert my_config.element_2 == "default 2", my_config.element_2
+    my_config.add_setting(
+        "test_sync_disable",
+        default="default",
+        getter=getter_that_gets_disabled)
 
-        # adding a setting doesn't change the UI elements
-        assert self.element_1 == "not set 1", self.element_1
-        assert self.element_2 == "not set 2", self.element_2
+    assert my_config.test_sync_disable == "default", my_config.test_sync_disable
 
-        my_config.set(["element_2"])
+    my_config.write(sync=False)
 
-        # calling set on element_2 doesn't affect element_1
-        assert self.element_1 == "not set 1", self.element_1
-        assert self.element_2 == "default 2", self.element_2
+    assert my_config.test_sync_disable == "default", my_config.test_sync_disable
 
-    def test_set__can_set_multiple_components_at_once(self):
-        my_config = nostalgic.Configuration()
 
-        self.element_1 = "not set 1"
-        self.element_2 = "not set 2"
+def test_write__creates_missing_directories(cfg_path):
+    temp_file = os.path.join(cfg_path, "nested", "deeper", "test")
+    my_config = nostalgic.Configuration(temp_file)
 
-        def set_element_1(value):
-            self.element_1 = value
+    my_config.write()
 
-        def set_element_2(value):
-            self.element_2 = value
+    assert os.path.exists(temp_file), temp_file
 
-        assert self.element_1 == "not set 1", self.element_1
-        assert self.element_2 == "not set 2", self.element_2
 
-        # confirm that the configuration is still in its default state
-        my_config.add_setting("element_1", default="default 1", setter=set_element_1)
-        my_config.add_setting("element_2", default="default 2", setter=set_element_2)
+def test_write__saves_to_given_filename(cfg_path):
+    config_file = cfg_path
+    other_file  = cfg_path + "_other"
+    my_config   = nostalgic.Configuration(config_file)
 
-        my_config.set(["element_1", "element_2"])
+    my_config.add_setting("first", default=1)
 
-        # confirm that the elements were set
-        assert self.element_1 == "default 1", self.element_1
-        assert self.element_2 == "default 2", self.element_2
-        assert my_config.element_1 == "default 1", my_config.element_1
-        assert my_config.element_2 == "default 2", my_config.element_2
+    my_config.write(other_file)
+
+    assert not os.path.exists(config_file), config_file
+
+    text = pathlib.Path(other_file).read_bytes()
+
+    assert text == _FIRST_ONLY_INI, text
+
+
+def test_write__failed_write_keeps_the_previous_file(cfg_path, monkeypatch):
+    my_config = nostalgic.Configuration(cfg_path)
+    my_config.add_setting("first", default=1)
+    my_config.write()
+
+    def fail(f, options):
+        f.write("[General]\n")
+        raise OSError("disk full")
+
+    monkeypatch.setattr(nostalgic.nostalgic, '_write_general', fail)
+
+    my_config.first = 2
+    with pytest.raises(OSError):
+        my_config.write()
+
+    text = pathlib.Path(cfg_path).read_bytes()
+
+    assert text == _FIRST_ONLY_INI, text
+    assert _leftover_temp_files(cfg_path) == [], _leftover_temp_files(cfg_path)
+
+
+def test_write__keeps_the_mode_of_an_existing_file(cfg_path):
+    pathlib.Path(cfg_path).write_bytes(b"")
+    os.chmod(cfg_path, 0o640)
+
+    my_config = nostalgic.Configuration(cfg_path)
+    my_config.add_setting("first", default=1)
+    my_config.write()
+
+    mode = stat.S_IMODE(os.stat(cfg_path).st_mode)
+
+    assert mode == 0o640, oct(mode)
+    assert pathlib.Path(cfg_path).read_bytes() == _FIRST_ONLY_INI, pathlib.Path(cfg_path).read_bytes()
+
+
+def test_write__new_files_honour_the_umask(cfg_path):
+    old_umask = os.umask(0o027)
+    try:
+        my_config = nostalgic.Configuration(cfg_path)
+        my_config.add_setting("first", default=1)
+        my_config.write()
+    finally:
+        os.umask(old_umask)
+
+    mode = stat.S_IMODE(os.stat(cfg_path).st_mode)
+
+    assert mode == 0o640, oct(mode)
+
+
+def test_write__writes_through_symlinks(cfg_path):
+    real_file = cfg_path + "_real"
+    pathlib.Path(real_file).write_bytes(b"")
+    os.chmod(real_file, 0o600)
+    try:
+        os.symlink(real_file, cfg_path)
+    except (OSError, NotImplementedError):
+        pytest.skip("symlinks aren't available")
+
+    my_config = nostalgic.Configuration(cfg_path)
+    my_config.add_setting("first", default=1)
+    my_config.write()
+
+    # the link is left in place and its target updated
+    assert os.path.islink(cfg_path), cfg_path
+    assert os.readlink(cfg_path) == real_file, os.readlink(cfg_path)
+    assert pathlib.Path(real_file).read_bytes() == _FIRST_ONLY_INI, pathlib.Path(real_file).read_bytes()
+
+    mode = stat.S_IMODE(os.stat(real_file).st_mode)
+    assert mode == 0o600, oct(mode)
+
+
+def test_write__accepts_an_open_stream(cfg_path):
+    my_config = nostalgic.Configuration(cfg_path)
+    my_config.add_setting("first", default=1)
+
+    stream = io.StringIO()
+    my_config.write(stream)
+
+    # the stream belongs to the caller and is left open
+    assert not stream.closed, "stream was closed"
+    assert stream.getvalue() == _FIRST_ONLY_INI.decode(), stream.getvalue()
+
+    assert not os.path.exists(my_config.config_file), my_config.config_file
+
+
+def test_write__values_round_trip_through_read(cfg_path):
+    my_config = nostalgic.Configuration(cfg_path)
+
+    # '%' used to trip up ConfigParser interpolation
+    my_config.add_setting("percent", default="100%")
+    my_config.add_setting("MixedCase", default=[1, 2.5, None, True])
+
+    my_config.write()
+
+    my_config.percent   = None
+    my_config.MixedCase = None
+
+    my_config.read()
 
-    def test_set__settings_without_setters_dont_cause_problems(self):
-        my_config = nostalgic.Configuration()
+    assert my_config.percent == "100%", my_config.percent
+    assert my_config.MixedCase == [1, 2.5, None, True], my_config.MixedCase
 
-        self.element_1 = "not set 1"
-        self.element_2 = "not set 2"
 
-        def set_element_1(value):
-            self.element_1 = value
+def test_write__values_encode_as_json(my_config):
+    cases = [
+        (True, 'true'), (False, 'false'), (None, 'null'),
+        (-12, '-12'), (1.5, '1.5'),
+        ("two", '"two"'), ('say "hi"', '"say \\"hi\\""'),
+        ("caf\u00e9", '"caf\\u00e9"'), ("a\tb", '"a\\tb"'),
+        ([1, "a"], '[1, "a"]'),
+    ]
+
+    my_config.add_setting("value")
+
+    for value, expected in cases:
+        my_config.value = value
+        stream = io.StringIO()
+        my_config.write(stream)
+        assert stream.getvalue() == f"[General]\nvalue = {expected}\n\n", (value, stream.getvalue())
+
+
+def test_write__config_file_is_created_if_none_exists(tmp_path, monkeypatch):
+    # a bare filename is relative to the current directory
+    monkeypatch.chdir(tmp_path)
+
+    non_temp_configuration = nostalgic.Configuration("test_config_file_right_here_please_delete")
+
+    # if filename has no directory, then directory creation code
+    # fails.  also, if the user gave the config_file relative to the
+    # current directory, the current directory could change and a
+    # second configuration be written. Prevent these by storing
+    # absolute path.
+    assert non_temp_configuration.config_file == str(tmp_path / "test_config_file_right_here_please_delete"), non_temp_configuration.config_file
+
+    assert not os.path.exists(non_temp_configuration.config_file), non_temp_configuration.config_file
+
+    non_temp_configuration.add_setting("test", default=True)
+    non_temp_configuration.write()
+
+    assert os.path.exists(non_temp_configuration.config_file), non_temp_configuration.config_file
+
+    text = pathlib.Path(non_temp_configuration.config_file).read_bytes()
+
+    assert text == b"[General]\ntest = true\n\n", text
+
+
+def test_get__takes_list_of_settings_and_calls_their_getters(my_config):
+    ui_element_1 = "got 1"
+
+    def get_element_1():
+        return ui_element_1
 
-        def set_element_2(value):
-            self.element_2 = value
+    my_config.add_setting("element_1", default="not got 1", getter=get_element_1)
 
-        assert self.element_1 == "not set 1", self.element_1
-        assert self.element_2 == "not set 2", self.element_2
+    assert ui_element_1 == "got 1", ui_element_1
+    assert my_config.element_1 == "not got 1", my_config.element_1
 
-        my_config.add_setting("element_1", default="default 1", setter=set_element_1)
-        my_config.add_setting("element_2", default="default 2", setter=set_element_2)
-        my_config.add_setting("no_setter", default="should not have been set")
+    my_config.get(["element_1"])
 
-        assert my_config.no_setter == "should not have been set"
+    assert my_config.element_1 == "got 1", my_config.element_1
 
-        assert my_config.set(["no_setter"]) == None
 
-    def test_set__passing_in_nothing_calls_all_setters(self):
-        my_config = nostalgic.Configuration()
+def test_get__return_value_is_the_setting_value_before_the_get(my_config):
+    ui_element_1 = "got 1"
+    ui_element_2 = "got 2"
 
-        self.element_1 = "not set 1"
-        self.element_2 = "not set 2"
+    def get_element_1():
+        return ui_element_1
 
-        def set_element_1(value):
-            self.element_1 = value
+    def get_element_2():
+        return ui_element_2
 
-        def set_element_2(value):
-            self.element_2 = value
+    my_config.add_setting("element_1", default="not got 1", getter=get_element_1)
+    my_config.add_setting("element_2", default="not got 2", getter=get_element_2)
 
-        assert self.element_1 == "not set 1", self.element_1
-        assert self.element_2 == "not set 2", self.element_2
+    assert ui_element_1 == "got 1", ui_element_1
+    assert ui_element_2 == "got 2", ui_element_2
 
-        my_config.add_setting("element_1", default="default 1", setter=set_element_1)
-        my_config.add_setting("element_2", default="default 2", setter=set_element_2)
+    assert my_config.element_1 == "not got 1", my_config.element_1
+    assert my_config.element_2 == "not got 2", my_config.element_2
 
-        my_config.set()
+    rv = my_config.get(["element_1", "element_2"])
 
-        assert self.element_1 == "default 1", self.element_1
-        assert self.element_2 == "default 2", self.element_2
+    assert rv == {"element_1": "not got 1", "element_2": "not got 2"}, rv
 
-    def test_set__use_default_argument_sets_default_values(self):
-        my_config = nostalgic.Configuration()
 
-        self.element_1 = "not set 1"
-        self.element_2 = "not set 2"
+def test_get__settings_without_getters_dont_cause_problems(my_config):
+    ui_element_1 = "got 1"
+    ui_element_2 = "got 2"
 
-        def set_element_1(value):
-            self.element_1 = value
+    def get_element_1():
+        return ui_element_1
 
-        def set_element_2(value):
-            self.element_2 = value
+    def get_element_2():
+        return ui_element_2
 
-        assert self.element_1 == "not set 1", self.element_1
-        assert self.element_2 == "not set 2", self.element_2
+    my_config.add_setting("element_1", default="not got 1", getter=get_element_1)
+    my_config.add_setting("element_2", default="not got 2", getter=get_element_2)
+    my_config.add_setting("no_getter", default="should not have got")
 
-        my_config.add_setting("element_1", default="default 1", setter=set_element_1)
-        my_config.add_setting("element_2", default="default 2", setter=set_element_2)
+    assert my_config.no_getter == "should not have got", my_config.no_getter
 
-        my_config.element_1 = "not default 1"
-        my_config.element_2 = "not default 2"
+    rv = my_config.get(["no_getter"])
 
-        assert my_config.element_1 == "not default 1", my_config.element_1
-        assert my_config.element_2 == "not default 2", my_config.element_2
+    assert rv == {}, rv
 
-        my_config.set(use_defaults=True)
 
-        assert self.element_1 == "default 1", self.element_1
-        assert self.element_2 == "default 2", self.element_2
+def test_get__calls_the_getters_of_the_requested_settings(my_config):
+    ui_element_1 = "got 1"
+    ui_element_2 = "got 2"
 
-    def test_set__sets_value_not_default_value_by_default(self):
-        my_config = nostalgic.Configuration()
+    def get_element_1():
+        return ui_element_1
 
-        self.element_1 = "not set 1"
-        self.element_2 = "not set 2"
+    def get_element_2():
+        return ui_element_2
 
-        def set_element_1(value):
-            self.element_1 = value
+    my_config.add_setting("element_1", default="not got 1", getter=get_element_1)
+    my_config.add_setting("element_2", default="not got 2", getter=get_element_2)
+    my_config.add_setting("no_getter", default="should not have got")
 
-        def set_element_2(value):
-            self.element_2 = value
+    # keys passed to get() and the expected (element_1, element_2)
+    cases = [
+        # getters are called separately
+        (["element_2"], ("not got 1", "got 2")),
+        # multiple settings can be got at once
+        (["element_1", "element_2"], ("got 1", "got 2")),
+        # passing in nothing calls all getters
+        (None, ("got 1", "got 2")),
+    ]
 
-        assert self.element_1 == "not set 1", self.element_1
-        assert self.element_2 == "not set 2", self.element_2
+    for keys, expected in cases:
+        # start each case from the defaults
+        my_config.element_1 = "not got 1"
+        my_config.element_2 = "not got 2"
 
-        my_config.add_setting("element_1", default="default 1", setter=set_element_1)
-        my_config.add_setting("element_2", default="default 2", setter=set_element_2)
+        my_config.get(keys)
 
-        my_config.element_1 = "not default 1"
-        my_config.element_2 = "not default 2"
+        got = (my_config.element_1, my_config.element_2)
+        assert got == expected, (keys, got)
 
-        assert my_config.element_1 == "not default 1", my_config.element_1
-        assert my_config.element_2 == "not default 2", my_config.element_2
+    assert my_config.no_getter == "should not have got", my_config.no_getter
 
-        my_config.set()
 
-        assert self.element_1 == "not default 1", self.element_1
-        assert self.element_2 == "not default 2", self.element_2
+def test_set__takes_list_of_settings_and_calls_their_setters(my_config):
+    element_1 = "not set 1"
 
-        my_config.set(use_defaults=False)
+    def set_element_1(value):
+        nonlocal element_1
+        element_1 = value
 
-        assert self.element_1 == "not default 1", self.element_1
-        assert self.element_2 == "not default 2", self.element_2
+    my_config.add_setting("element_1", default="default 1", setter=set_element_1)
 
-    def test_set__use_default_argument_doesnt_reassign_setting_value(self):
-        my_config = nostalgic.Configuration()
+    assert element_1 == "not set 1", element_1
+    assert my_config.element_1 == "default 1", my_config.element_1
 
-        self.element_1 = "not set 1"
-        self.element_2 = "not set 2"
+    my_config.set(["element_1"])
 
-        def set_element_1(value):
-            self.element_1 = value
+    assert element_1 == "default 1", element_1
+    assert my_config.element_1 == "default 1", my_config.element_1
 
-        def set_element_2(value):
-            self.element_2 = value
 
-        assert self.element_1 == "not set 1", self.element_1
-        assert self.element_2 == "not set 2", self.element_2
+def test_set__settings_without_setters_dont_cause_problems(my_config):
+    element_1 = "not set 1"
+    element_2 = "not set 2"
 
-        my_config.add_setting("element_1", default="default 1", setter=set_element_1)
-        my_config.add_setting("element_2", default="default 2", setter=set_element_2)
+    def set_element_1(value):
+        nonlocal element_1
+        element_1 = value
 
-        my_config.element_1 = "not default 1"
-        my_config.element_2 = "not default 2"
+    def set_element_2(value):
+        nonlocal element_2
+        element_2 = value
 
-        assert my_config.element_1 == "not default 1", my_config.element_1
-        assert my_config.element_2 == "not default 2", my_config.element_2
+    assert element_1 == "not set 1", element_1
+    assert element_2 == "not set 2", element_2
 
-        my_config.set(use_defaults=True)
+    my_config.add_setting("element_1", default="default 1", setter=set_element_1)
+    my_config.add_setting("element_2", default="default 2", setter=set_element_2)
+    my_config.add_setting("no_setter", default="should not have been set")
 
-        assert self.element_1 == "default 1", self.element_1
-        assert self.element_2 == "default 2", self.element_2
+    assert my_config.no_setter == "should not have been set", my_config.no_setter
 
-        assert my_config.element_1 == "not default 1", my_config.element_1
-        assert my_config.element_2 == "not default 2", my_config.element_2
+    assert my_config.set(["no_setter"]) == None, my_config.set(["no_setter"])
 
-    def test_set__use_default_argument_with_sync_argument_reassigns_setting_values_to_default(self):
-        my_config = nostalgic.Configuration()
 
-        self.element_1 = "not set 1"
-        self.element_2 = "not set 2"
+def test_set__calls_the_setters_of_the_requested_settings(my_config):
+    element_1 = "not set 1"
+    element_2 = "not set 2"
 
-        def set_element_1(value):
-            self.element_1 = value
+    def set_element_1(value):
+        nonlocal element_1
+        element_1 = value
 
-        def set_element_2(value):
-            self.element_2 = value
+    def set_element_2(value):
+        nonlocal element_2
+        element_2 = value
 
-        assert self.element_1 == "not set 1", self.element_1
-        assert self.element_2 == "not set 2", self.element_2
+    my_config.add_setting("element_1", default="default 1", setter=set_element_1)
+    my_config.add_setting("element_2", default="default 2", setter=set_element_2)
 
-        my_config.add_setting("element_1", default="default 1", setter=set_element_1)
-        my_config.add_setting("element_2", default="default 2", setter=set_element_2)
+    # adding a setting doesn't change the UI elements
+    assert element_1 == "not set 1", element_1
+    assert element_2 == "not set 2", element_2
 
-        my_config.element_1 = "not default 1"
-        my_config.element_2 = "not default 2"
+    # keys passed to set() and the expected (element_1, element_2)
+    cases = [
+        # setters are called separately
+        (["element_2"], ("not set 1", "default 2")),
+        # multiple components can be set at once
+        (["element_1", "element_2"], ("default 1", "default 2")),
+        # passing in nothing calls all setters
+        (None, ("default 1", "default 2")),
+    ]
 
-        assert my_config.element_1 == "not default 1", my_config.element_1
-        assert my_config.element_2 == "not default 2", my_config.element_2
+    for keys, expected in cases:
+        # start each case from unset UI elements
+        element_1 = "not set 1"
+        element_2 = "not set 2"
 
-        my_config.set(use_defaults=True, sync=True)
+        my_config.set(keys)
 
-        assert self.element_1 == "default 1", self.element_1
-        assert self.element_2 == "default 2", self.element_2
+        got = (element_1, element_2)
+        assert got == expected, (keys, got)
 
+        # setting the UI doesn't change the configuration
         assert my_config.element_1 == "default 1", my_config.element_1
         assert my_config.element_2 == "default 2", my_config.element_2
 
 
+def test_set__use_default_argument_sets_default_values(my_config):
+    element_1 = "not set 1"
+    element_2 = "not set 2"
+
+    def set_element_1(value):
+        nonlocal element_1
+        element_1 = value
+
+    def set_element_2(value):
+        nonlocal element_2
+        element_2 = value
+
+    assert element_1 == "not set 1", element_1
+    assert element_2 == "not set 2", element_2
+
+    my_config.add_setting("element_1", default="default 1", setter=set_element_1)
+    my_config.add_setting("element_2", default="default 2", setter=set_element_2)
+
+    my_config.element_1 = "not default 1"
+    my_config.element_2 = "not default 2"
+
+    assert my_config.element_1 == "not default 1", my_config.element_1
+    assert my_config.element_2 == "not default 2", my_config.element_2
+
+    my_config.set(use_defaults=True)
+
+    assert element_1 == "default 1", element_1
+    assert element_2 == "default 2", element_2
+
+
+def test_set__sets_value_not_default_value_by_default(my_config):
+    element_1 = "not set 1"
+    element_2 = "not set 2"
+
+    def set_element_1(value):
+        nonlocal element_1
+        element_1 = value
+
+    def set_element_2(value):
+        nonlocal element_2
+        element_2 = value
+
+    assert element_1 == "not set 1", element_1
+    assert element_2 == "not set 2", element_2
+
+    my_config.add_setting("element_1", default="default 1", setter=set_element_1)
+    my_config.add_setting("element_2", default="default 2", setter=set_element_2)
+
+    my_config.element_1 = "not default 1"
+    my_config.element_2 = "not default 2"
+
+    assert my_config.element_1 == "not default 1", my_config.element_1
+    assert my_config.element_2 == "not default 2", my_config.element_2
+
+    my_config.set()
+
+    assert element_1 == "not default 1", element_1
+    assert element_2 == "not default 2", element_2
+
+    my_config.set(use_defaults=False)
+
+    assert element_1 == "not default 1", element_1
+    assert element_2 == "not default 2", element_2
+
+
+def test_set__use_default_argument_doesnt_reassign_setting_value(my_config):
+    element_1 = "not set 1"
+    element_2 = "not set 2"
+
+    def set_element_1(value):
+        nonlocal element_1
+        element_1 = value
+
+    def set_element_2(value):
+        nonlocal element_2
+        element_2 = value
+
+    assert element_1 == "not set 1", element_1
+    assert element_2 == "not set 2", element_2
+
+    my_config.add_setting("element_1", default="default 1", setter=set_element_1)
+    my_config.add_setting("element_2", default="default 2", setter=set_element_2)
+
+    my_config.element_1 = "not default 1"
+    my_config.element_2 = "not default 2"
+
+    assert my_config.element_1 == "not default 1", my_config.element_1
+    assert my_config.element_2 == "not default 2", my_config.element_2
+
+    my_config.set(use_defaults=True)
+
+    assert element_1 == "default 1", element_1
+    assert element_2 == "default 2", element_2
+
+    assert my_config.element_1 == "not default 1", my_config.element_1
+    assert my_config.element_2 == "not default 2", my_config.element_2
+
+
+def test_set__use_default_argument_with_sync_argument_reassigns_setting_values_to_default(my_config):
+    element_1 = "not set 1"
+    element_2 = "not set 2"
+
+    def set_element_1(value):
+        nonlocal element_1
+        element_1 = value
+
+    def set_element_2(value):
+        nonlocal element_2
+        element_2 = value
+
+    assert element_1 == "not set 1", element_1
+    assert element_2 == "not set 2", element_2
+
+    my_config.add_setting("element_1", default="default 1", setter=set_element_1)
+    my_config.add_setting("element_2", default="default 2", setter=set_element_2)
+
+    my_config.element_1 = "not default 1"
+    my_config.element_2 = "not default 2"
+
+    assert my_config.element_1 == "not default 1", my_config.element_1
+    assert my_config.element_2 == "not default 2", my_config.element_2
+
+    my_config.set(use_defaults=True, sync=True)
+
+    assert element_1 == "default 1", element_1
+    assert element_2 == "default 2", element_2
+
+    assert my_config.element_1 == "default 1", my_config.element_1
+    assert my_config.element_2 == "default 2", my_config.element_2
+
 
 if __name__ == '__main__':
-    main()
+    # allow running the file directly, as before the move to pytest
+    sys.exit(pytest.main([__file__, "-q", "-p", "no:cacheprovider"]))